@@ -4,8 +4,8 @@ Protein-Ligand Simulation (Robust Version)
 
 import asyncio
 import pygame
-import random
 import math
+from itertools import chain, repeat
 from dataclasses import dataclass
 import sys
 import os
@@ -18,14 +18,36 @@ except ImportError:
     UI_AVAILABLE = False
     print("Warning: pygame_gui not found.")
 
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_agg import FigureCanvasAgg
+try:
+    import numba
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+    # One thread per physical core (assumes 2-way SMT); hyperthreads only add cache contention here
+    numba.set_num_threads(max(1, min(numba.config.NUMBA_NUM_THREADS, (os.cpu_count() or 2) // 2)))
+except ImportError:
+    # Not available in the browser build; the NumPy code path is used instead
+    NUMBA_AVAILABLE = False
+    prange = range
+    def njit(*args, **kwargs):
+        return args[0] if args and callable(args[0]) else (lambda func: func)
+
+try:
+    from scipy.spatial import cKDTree
+    SCIPY_AVAILABLE = True
+except ImportError:
+    # Optional; without it the NumPy binding path searches the spatial grid
+    SCIPY_AVAILABLE = False
+
 import numpy as np
 
 # --- Constants ---
 SCREEN_WIDTH = 1200
 SCREEN_HEIGHT = 800
 SIDEBAR_WIDTH = 300
+GRAPH_SIZE = (SIDEBAR_WIDTH - 40, 200)
+LOW_RES_PARTICLE_THRESHOLD = 500  # above this many particles the sim area is drawn at render_scale
+GRAPH_SAMPLE_INTERVAL = 6  # frames per graph sample (10 Hz at 60 FPS)
+GRAPH_HISTORY = 600        # samples kept per series
 
 # Colors
 BLACK = (0, 0, 0)
@@ -38,6 +60,21 @@ BOUND_LIGAND_COLOR = (255, 255, 0)
 DOCKING_SITE_COLOR = (255, 255, 255)
 DARK_GREY = (50, 50, 50)
 
+# Particle radii (pixels)
+PROTEIN_RADIUS = 15
+LIGAND_RADIUS = 6
+DOCKING_SITE_RADIUS = 5
+# Species codes; a protein's bound_kind is KIND_PROTEIN while its docking site is empty
+KIND_PROTEIN = 0
+KIND_LIGAND = 1
+KIND_COMPETITOR = 2
+# New particles are spawned one per grid cell; cells fit the largest particle
+SPAWN_CELL_SIZE = 2 * max(PROTEIN_RADIUS, LIGAND_RADIUS)
+# Random positions tried at once for a new particle that lands on an existing one
+SPAWN_CANDIDATES = 64
+# Below this many proteins the NumPy binding path tests all pairs; the grid does not pay off
+GRID_MIN_PROTEINS = 32
+
 @dataclass
 class Parameters:
     num_proteins: int = 20
@@ -49,95 +86,284 @@ class Parameters:
     k_off: float = 0.01
     binding_radius: float = 10.0
     dt: float = 10
+    seed: int | None = None
+    render_scale: float = 0.5
     sim_area: tuple = (SCREEN_WIDTH - SIDEBAR_WIDTH, SCREEN_HEIGHT)
 
-class Particle:
-    def __init__(self, x, y, radius, color):
-        self.position = pygame.Vector2(x, y)
-        self.velocity = pygame.Vector2(0, 0)
+class ParticleBatch:
+    """All particles of one species, stored as parallel NumPy arrays (SoA).
+
+    The columns are views of the first len() rows of capacity-sized buffers,
+    so slider changes rarely reallocate.
+    """
+    def __init__(self, kind, radius, color):
+        self.kind = kind
         self.radius = radius
         self.color = color
-
-    def move_brownian(self, params):
-        displacement_x = random.uniform(-1, 1)
-        displacement_y = random.uniform(-1, 1)
-        displacement_vector = pygame.Vector2(displacement_x, displacement_y)
-        scale_factor = math.sqrt(params.temperature * params.dt)
-        self.position += displacement_vector * scale_factor
-
-    def check_wall_collision_and_bounce(self, sim_rect):
-        if self.position.x - self.radius < sim_rect.left:
-            self.position.x = sim_rect.left + self.radius
-            self.velocity.x *= -1
-        elif self.position.x + self.radius > sim_rect.right:
-            self.position.x = sim_rect.right - self.radius
-            self.velocity.x *= -1
-        if self.position.y - self.radius < sim_rect.top:
-            self.position.y = sim_rect.top + self.radius
-            self.velocity.y *= -1
-        elif self.position.y + self.radius > sim_rect.bottom:
-            self.position.y = sim_rect.bottom - self.radius
-            self.velocity.y *= -1
-
-class Protein(Particle):
-    radius = 15
-    def __init__(self, x, y):
-        super().__init__(x, y, radius=Protein.radius, color=PROTEIN_COLOR)
-        self.bound_ligands = []
-
-class Ligand(Particle):
-    radius = 6
-    def __init__(self, x, y):
-        super().__init__(x, y, radius=Ligand.radius, color=NORMAL_LIGAND_COLOR)
-        self.is_bound = False
-        self.bound_to = None
-
-    def unbind(self):
-        if self.bound_to:
-            try:
-                self.bound_to.bound_ligands.remove(self)
-            except ValueError:
-                pass 
-            
-            direction_vector = self.position - self.bound_to.position
-            separation_distance = self.bound_to.radius + self.radius + 2
-            if direction_vector.length() > 0:
-                direction_vector.normalize_ip()
-            else:
-                direction_vector = pygame.Vector2(random.uniform(-1, 1), random.uniform(-1, 1)).normalize()
-            self.position = self.bound_to.position + direction_vector * separation_distance
-            kick_magnitude = random.uniform(1, 2)
-            self.velocity = direction_vector * kick_magnitude
-        self.is_bound = False
-        self.bound_to = None
-        self.color = self.get_initial_color()
-
-    def get_initial_color(self):
-        return NORMAL_LIGAND_COLOR
-
-class CompetitorLigand(Ligand):
-    def __init__(self, x, y):
-        super().__init__(x, y)
-        self.color = COMPETITOR_LIGAND_COLOR
-    
-    def get_initial_color(self):
-        return COMPETITOR_LIGAND_COLOR
+        self._count = 0
+        self._reserve(0)
+
+    def _reserve(self, capacity):
+        pos = np.empty((capacity, 2), dtype=np.float32)
+        vel = np.empty((capacity, 2), dtype=np.float32)
+        # Ligands: bound_to holds the protein index, -1 while free.
+        # Proteins: is_bound marks an occupied docking site, bound_to and
+        # bound_kind hold the index and species of the docked ligand.
+        is_bound = np.empty(capacity, dtype=bool)
+        bound_to = np.empty(capacity, dtype=np.int32)
+        bound_kind = np.empty(capacity, dtype=np.int8)
+        if self._count:
+            n = self._count
+            pos[:n], vel[:n], is_bound[:n], bound_to[:n], bound_kind[:n] = self.pos, self.vel, self.is_bound, self.bound_to, self.bound_kind
+        self._buffers = (pos, vel, is_bound, bound_to, bound_kind)
+        # Per-step scratch space (Brownian noise, then uniform draws; binding targets);
+        # contents do not survive a step
+        self.scratch = np.empty((capacity, 2), dtype=np.float32)
+        self.scratch_index = np.empty(capacity, dtype=np.int32)
+        self._set_count(self._count)
+
+    def _set_count(self, n):
+        self._count = n
+        self.pos, self.vel, self.is_bound, self.bound_to, self.bound_kind = (buffer[:n] for buffer in self._buffers)
+
+    def __len__(self):
+        return self._count
+
+    def append(self, positions):
+        positions = np.asarray(positions, dtype=np.float32).reshape(-1, 2)
+        start = self._count
+        end = start + len(positions)
+        if end > len(self._buffers[0]):
+            self._reserve(max(end, 2 * len(self._buffers[0])))
+        self._set_count(end)
+        self.pos[start:] = positions
+        self.vel[start:] = 0
+        self.is_bound[start:] = False
+        self.bound_to[start:] = -1
+        self.bound_kind[start:] = KIND_PROTEIN
+
+    def uniforms(self, rng, n):
+        # n float32 draws from [0, 1) into the scratch buffer; valid until the next scratch use
+        return rng.random(dtype=np.float32, out=self.scratch.reshape(-1)[:n])
+
+    def truncate(self, n):
+        self._set_count(min(n, self._count))
+
+    def clear_partner(self, idx):
+        self.is_bound[idx] = False
+        self.bound_to[idx] = -1
+        self.bound_kind[idx] = KIND_PROTEIN
+
+def rate_to_probability(rate, dt):
+    """Probability that a first-order process with the given rate(s) fires within dt."""
+    x = np.asarray(rate, dtype=np.float32) * np.float32(dt)
+    # 1 - exp(-x) ~= x for small x; the relative error stays below x / 2
+    return np.where(x < 0.05, x, -np.expm1(-x)).astype(np.float32)
+
+def wall_limits(sim_rect, radius):
+    """Lowest and highest allowed (x, y) centre for a particle of the given radius."""
+    lo = np.array((sim_rect.left + radius, sim_rect.top + radius), dtype=np.float32)
+    hi = np.array((sim_rect.right - radius, sim_rect.bottom - radius), dtype=np.float32)
+    return lo, hi
+
+@njit(cache=True, fastmath=True, parallel=True)
+def brownian_kernel(pos, vel, noise, scale_factor, lo, hi, frozen):
+    for i in prange(len(pos)):
+        if frozen is not None:
+            if frozen[i]:
+                continue
+        for axis in range(2):
+            p = pos[i, axis] + noise[i, axis] * scale_factor
+            if p < lo[axis]:
+                p = lo[axis]
+                vel[i, axis] = -vel[i, axis]
+            elif p > hi[axis]:
+                p = hi[axis]
+                vel[i, axis] = -vel[i, axis]
+            pos[i, axis] = p
+
+def move_brownian(pos, vel, scale_factor, rng, lo, hi, frozen=None, moving=None, scratch=None):
+    """Brownian step fused with the wall bounce, so pos and vel are streamed once.
+
+    moving optionally gives the indices of the rows not in frozen, if the caller already has them.
+    scratch is an optional float32 (>= len(pos), 2) buffer the noise is drawn into.
+    """
+    def noise(n):
+        out = None if scratch is None else scratch[:n]
+        return rng.standard_normal((n, 2), dtype=np.float32, out=out)
+
+    # Euler-Maruyama step: Gaussian displacement with variance T*dt per axis
+    if NUMBA_AVAILABLE:
+        brownian_kernel(pos, vel, noise(len(pos)), scale_factor, lo, hi, frozen)
+        return
+    if frozen is None:
+        # Everything moves: update in place, no gather/scatter
+        step = noise(len(pos))
+        step *= scale_factor
+        pos += step
+        bounced = (pos < lo) | (pos > hi)
+        np.negative(vel, out=vel, where=bounced)
+        np.clip(pos, lo, hi, out=pos)
+        return
+    # Noise is drawn only for the particles that actually move
+    if moving is None:
+        moving = np.flatnonzero(~frozen)
+    step = noise(len(moving))
+    step *= scale_factor
+    new_pos = pos[moving] + step
+    bounced = (new_pos < lo) | (new_pos > hi)
+    v = vel[moving]
+    vel[moving] = np.where(bounced, -v, v)
+    pos[moving] = np.clip(new_pos, lo, hi)
+
+class SpatialGrid:
+    """Uniform grid over the simulation area, stored CSR-style (cell_start, cell_items)."""
+    # (dx, dy) offsets of a cell's 3x3 neighbourhood
+    NEIGHBOURS = np.array([(dx, dy) for dy in (-1, 0, 1) for dx in (-1, 0, 1)], dtype=np.int32)
+
+    def __init__(self, width, height, cell_size):
+        self.cell_size = np.float32(cell_size)
+        self.cols = max(1, math.ceil(width / cell_size))
+        self.rows = max(1, math.ceil(height / cell_size))
+        self.cell_start = np.zeros(self.cols * self.rows + 1, dtype=np.int32)
+        self.cell_items = np.empty(0, dtype=np.int32)
+
+    def cells_of(self, pos):
+        cx = np.clip((pos[:, 0] // self.cell_size).astype(np.int32), 0, self.cols - 1)
+        cy = np.clip((pos[:, 1] // self.cell_size).astype(np.int32), 0, self.rows - 1)
+        return cx, cy
+
+    def rebuild(self, pos):
+        cx, cy = self.cells_of(pos)
+        cell = cy * self.cols + cx
+        # Items of cell c are cell_items[cell_start[c]:cell_start[c + 1]]
+        self.cell_items = np.argsort(cell, kind='stable').astype(np.int32)
+        self.cell_start[1:] = np.cumsum(np.bincount(cell, minlength=self.cols * self.rows))
+
+    def query_pairs(self, pos):
+        """Return (query_idx, item_idx) for every item in the 3x3 cells around each query point."""
+        cx, cy = self.cells_of(pos)
+        ncx = cx[:, None] + self.NEIGHBOURS[None, :, 0]
+        ncy = cy[:, None] + self.NEIGHBOURS[None, :, 1]
+        valid = (ncx >= 0) & (ncx < self.cols) & (ncy >= 0) & (ncy < self.rows)
+        cell = np.where(valid, ncy * self.cols + ncx, 0).ravel()
+        start = self.cell_start[cell]
+        counts = np.where(valid.ravel(), self.cell_start[cell + 1] - start, 0)
+        total = int(counts.sum())
+        block_begin = np.repeat(np.cumsum(counts) - counts, counts)
+        items = self.cell_items[np.repeat(start, counts) + np.arange(total) - block_begin]
+        queries = np.repeat(np.repeat(np.arange(len(pos)), len(self.NEIGHBOURS)), counts)
+        return queries, items
+
+@njit(cache=True)
+def seed_numba(seed):
+    # Numba keeps its own generator state, separate from NumPy's
+    np.random.seed(seed)
+
+@njit(cache=True, fastmath=True, parallel=True)
+def find_binding_targets(lig_pos, lig_bound, prot_pos, prot_bound, cell_start, cell_items, cols, rows, cell_size, capture_r, capture_r2, target):
+    """For every free ligand, the lowest-index free protein within capture_r, else -1 (Numba kernel)."""
+    for i in prange(len(lig_pos)):
+        target[i] = -1
+        if lig_bound[i]:
+            continue
+        x = lig_pos[i, 0]
+        y = lig_pos[i, 1]
+        cx = min(max(int(x // cell_size), 0), cols - 1)
+        cy = min(max(int(y // cell_size), 0), rows - 1)
+        best = -1
+        for ny in range(max(cy - 1, 0), min(cy + 2, rows)):
+            for nx in range(max(cx - 1, 0), min(cx + 2, cols)):
+                cell = ny * cols + nx
+                for k in range(cell_start[cell], cell_start[cell + 1]):
+                    j = cell_items[k]
+                    if prot_bound[j] or (best >= 0 and j > best):
+                        continue
+                    # Cheap per-axis reject first; most grid neighbours fail it
+                    dx = x - prot_pos[j, 0]
+                    if abs(dx) >= capture_r:
+                        continue
+                    dy = y - prot_pos[j, 1]
+                    if abs(dy) >= capture_r:
+                        continue
+                    if dx * dx + dy * dy < capture_r2:
+                        best = j
+        target[i] = best
+
+@njit(cache=True, fastmath=True)
+def binding_step(kind, lig_pos, lig_vel, lig_bound, lig_bound_to, prot_pos, prot_bound, prot_bound_to, prot_bound_kind,
+                 target, separation, p_on, p_off):
+    """Unbinding and binding of one ligand species given find_binding_targets' result (Numba kernel).
+
+    Runs serially: each step reads and claims protein occupancy.
+    """
+    for i in range(len(lig_pos)):
+        if lig_bound[i]:
+            # Bound ligands keep the position where they docked; they are drawn on their protein
+            j = lig_bound_to[i]
+            if np.random.random() < p_off:
+                # Leave on the side the ligand docked from
+                dx = lig_pos[i, 0] - prot_pos[j, 0]
+                dy = lig_pos[i, 1] - prot_pos[j, 1]
+                length2 = dx * dx + dy * dy
+                if length2 > 0:
+                    inv_length = np.float32(1.0) / np.sqrt(length2)
+                    dx *= inv_length
+                    dy *= inv_length
+                else:
+                    # Casts keep dx/dy float32; mixing in float64 would widen the whole release path
+                    angle = np.random.uniform(0.0, 2.0 * np.pi)
+                    dx = np.float32(np.cos(angle))
+                    dy = np.float32(np.sin(angle))
+                kick_magnitude = np.float32(np.random.uniform(1.0, 2.0))
+                lig_pos[i, 0] = prot_pos[j, 0] + dx * separation
+                lig_pos[i, 1] = prot_pos[j, 1] + dy * separation
+                lig_vel[i, 0] = dx * kick_magnitude
+                lig_vel[i, 1] = dy * kick_magnitude
+                lig_bound[i] = False
+                lig_bound_to[i] = -1
+                prot_bound[j] = False
+                prot_bound_to[j] = -1
+                prot_bound_kind[j] = KIND_PROTEIN
+        else:
+            j = target[i]
+            # Another ligand may have claimed the protein earlier in this pass
+            if j >= 0 and not prot_bound[j] and np.random.random() < p_on:
+                lig_bound[i] = True
+                lig_bound_to[i] = j
+                prot_bound[j] = True
+                prot_bound_to[j] = i
+                prot_bound_kind[j] = kind
 
 class Simulation:
     def __init__(self):
         pygame.init()
         self.params = Parameters()
+        self.rng = np.random.default_rng(self.params.seed)
+        if NUMBA_AVAILABLE and self.params.seed is not None:
+            seed_numba(self.params.seed)
         self.paused = False
+        self._pending_sliders = {}
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("Protein-Ligand Interaction Simulation")
         self.clock = pygame.time.Clock()
         self.sim_rect = pygame.Rect(0, 0, self.params.sim_area[0], self.params.sim_area[1])
         self.sidebar_rect = pygame.Rect(self.params.sim_area[0], 0, SIDEBAR_WIDTH, SCREEN_HEIGHT)
         self.font = pygame.font.Font(None, 24)
+        self.small_font = pygame.font.Font(None, 16)
         
-        self.proteins = []
-        self.ligands = []
-        self.competitor_ligands = []
+        self.proteins = ParticleBatch(KIND_PROTEIN, PROTEIN_RADIUS, PROTEIN_COLOR)
+        self.ligands = ParticleBatch(KIND_LIGAND, LIGAND_RADIUS, NORMAL_LIGAND_COLOR)
+        self.competitor_ligands = ParticleBatch(KIND_COMPETITOR, LIGAND_RADIUS, COMPETITOR_LIGAND_COLOR)
+        # Batches are resized in place, so these groupings stay valid for the whole run
+        self.ligand_batches = (self.ligands, self.competitor_ligands)
+        self.batches = (self.proteins,) + self.ligand_batches
+        # Clamp bounds for the wall bounce, per species; the simulation area never changes
+        self._wall_limits = [wall_limits(self.sim_rect, batch.radius) for batch in self.batches]
+        # Cell size equals the capture radius, so a ligand only needs its 3x3 neighbourhood
+        self.protein_grid = None
+        # No two particles touch across more than one cell of this size, so a 3x3 query finds every overlap
+        self._placement_grid = SpatialGrid(self.sim_rect.width, self.sim_rect.height, SPAWN_CELL_SIZE)
         
         # --- ROBUST UI SETUP ---
         self.ui_manager = None
@@ -153,7 +379,11 @@ class Simulation:
                 print("WARNING: theme.json or font.ttf missing. Starting in SAFE MODE (No UI).")
                 # Fallback: No UI, just simulation
 
+        self._update_rate_constants()
+        self._sprite_sets = {}
+        self._low_res_surface = None
         self._initialize_particles()
+        self._setup_graph_surface()
         self._initialize_graph()
 
     def _setup_ui_elements(self):
@@ -197,154 +427,360 @@ class Simulation:
         y_pos += label_height
         self.kon_competitor_slider = pygame_gui.elements.UIHorizontalSlider(relative_rect=pygame.Rect((x_pos, y_pos), (slider_width, slider_height)), start_value=self.params.k_on_competitor, value_range=(0.0, 1.0), manager=self.ui_manager, container=self.ui_panel)
 
+    def _sprite_set(self, scale):
+        # Every particle of a species/state looks the same, so rasterize each look once per scale
+        sprites = self._sprite_sets.get(scale)
+        if sprites is not None:
+            return sprites
+
+        def circle_sprite(color, radius, dot_radius=0):
+            # Anti-aliased by drawing at 4x and smoothscaling down; affordable because it only runs
+            # once. (gfxdraw.aacircle overwrites alpha on SRCALPHA surfaces and leaves holes.)
+            supersample = 4
+            radius = max(1, round(radius * scale))
+            size = 2 * radius + 3  # one pixel of margin for the soft rim
+            center = size * supersample // 2
+            big = pygame.Surface((size * supersample, size * supersample), pygame.SRCALPHA)
+            big.fill((*color, 0))
+            pygame.draw.circle(big, color, (center, center), radius * supersample)
+            if dot_radius:
+                pygame.draw.circle(big, DOCKING_SITE_COLOR, (center, center), max(1, round(dot_radius * scale)) * supersample)
+            return pygame.transform.smoothscale(big, (size, size)).convert_alpha()
+
+        sprites = {
+            'protein': circle_sprite(PROTEIN_COLOR, PROTEIN_RADIUS, DOCKING_SITE_RADIUS),
+            'ligand': circle_sprite(NORMAL_LIGAND_COLOR, LIGAND_RADIUS),
+            'competitor': circle_sprite(COMPETITOR_LIGAND_COLOR, LIGAND_RADIUS),
+            'bound': circle_sprite(BOUND_LIGAND_COLOR, LIGAND_RADIUS),
+        }
+        self._sprite_sets[scale] = sprites
+        return sprites
+
+    def _update_rate_constants(self):
+        # Per-step constants derived from the parameters; refresh whenever those change.
+        # Stored as float32 so they never promote the float32 particle arrays to float64.
+        self._brownian_scale = np.float32(math.sqrt(self.params.temperature * self.params.dt))
+        # Binding probability per step, indexed by species code (KIND_PROTEIN never binds)
+        self._p_on = rate_to_probability((0.0, self.params.k_on, self.params.k_on_competitor), self.params.dt)
+        self._p_off = rate_to_probability(self.params.k_off, self.params.dt)[()]
+        self._capture_r = np.float32(PROTEIN_RADIUS + self.params.binding_radius)
+        self._capture_r2 = self._capture_r * self._capture_r
+        # Centre distance at which a released ligand is placed, indexed by species code like _p_on
+        self._separation = np.array([0] + [self.proteins.radius + batch.radius + 2 for batch in self.ligand_batches], dtype=np.float32)
+
+    def _setup_graph_surface(self):
+        # Static parts of the plot (title, legend) are rendered once and reused
+        self.graph_surf = pygame.Surface(GRAPH_SIZE)
+        width, height = GRAPH_SIZE
+        self._graph_plot_rect = pygame.Rect(30, 22, width - 38, height - 32)
+        self._graph_plot_surf = self.graph_surf.subsurface(self._graph_plot_rect)
+        self._graph_title = self.small_font.render("Bound Ligands", True, WHITE)
+        # The legend sits over the scrolling plot, so it is an overlay blitted after the graph
+        labels = [(self.small_font.render(text, True, WHITE), color) for text, color in (("Normal", NORMAL_LIGAND_COLOR), ("Competitors", COMPETITOR_LIGAND_COLOR))]
+        label_width = max(label.get_width() for label, _ in labels)
+        self._graph_legend = pygame.Surface((label_width + 14, sum(label.get_height() for label, _ in labels)), pygame.SRCALPHA)
+        legend_y = 0
+        for label, color in labels:
+            label_x = self._graph_legend.get_width() - label.get_width()
+            pygame.draw.line(self._graph_legend, color, (label_x - 14, legend_y + label.get_height() // 2), (label_x - 4, legend_y + label.get_height() // 2))
+            self._graph_legend.blit(label, (label_x, legend_y))
+            legend_y += label.get_height()
+        self._graph_legend_pos = (self._graph_plot_rect.right - 2 - self._graph_legend.get_width(), self._graph_plot_rect.top + 2)
+        self._graph_ymax = None
+        self._graph_ticks = {}
+
     def _initialize_graph(self):
-        self.time_steps = []
-        self.bound_ligands_data = []
-        self.bound_competitor_data = []
+        self._graph_tick_counter = 0
+        # Ring buffer of bound counts (rows: normal, competitor). Every sample is written twice,
+        # GRAPH_HISTORY apart, so the latest samples are always one contiguous slice.
+        self._graph_history = np.zeros((2, 2 * GRAPH_HISTORY), dtype=np.int32)
+        self._graph_samples = 0
+        self._redraw_graph()
 
     def _update_graph_data(self):
-        current_time_step = len(self.time_steps)
-        self.time_steps.append(current_time_step)
-        bound_ligands_count = 0
-        bound_competitors_count = 0
-        for protein in self.proteins:
-            if protein.bound_ligands:
-                bound_ligand = protein.bound_ligands[0]
-                if isinstance(bound_ligand, CompetitorLigand):
-                    bound_competitors_count += 1
-                else:
-                    bound_ligands_count += 1
-        self.bound_ligands_data.append(bound_ligands_count)
-        self.bound_competitor_data.append(bound_competitors_count)
-
-    def _draw_graph(self):
-        dark_grey_norm = tuple(c / 255.0 for c in DARK_GREY)
-        white_norm = tuple(c / 255.0 for c in WHITE)
-        
-        fig = plt.Figure(figsize=(3, 2), dpi=100, facecolor=dark_grey_norm)
-        canvas = FigureCanvasAgg(fig)
-        ax = fig.add_subplot(111)
-        ax.set_facecolor(dark_grey_norm)
-        ax.tick_params(colors=white_norm, labelsize=6)
-        ax.spines['left'].set_color(white_norm)
-        ax.spines['bottom'].set_color(white_norm)
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
-        
-        time_in_seconds = [t / 60.0 for t in self.time_steps]
-        if len(time_in_seconds) > 500:
-             time_in_seconds = time_in_seconds[-500:]
-             data_ligands = self.bound_ligands_data[-500:]
-             data_comp = self.bound_competitor_data[-500:]
-        else:
-             data_ligands = self.bound_ligands_data
-             data_comp = self.bound_competitor_data
-
-        ax.plot(time_in_seconds, data_ligands, color='#6496FF', label='Normal', linewidth=1)
-        ax.plot(time_in_seconds, data_comp, color='red', label='Competitors', linewidth=1)
-        
-        ax.set_title("Bound Ligands", color=white_norm, fontsize=8)
-        ax.set_ylim(0, self.params.num_proteins)
-        ax.legend(loc='upper right', fontsize=5, frameon=False, labelcolor='white')
-        
-        canvas.draw()
-        renderer = canvas.get_renderer()
-        raw_data = renderer.buffer_rgba()
-        size = canvas.get_width_height()
-        plt.close(fig)
-        
-        return pygame.image.frombuffer(raw_data, size, "RGBA")
+        # Occupants per species in one pass over the docking sites
+        counts = np.bincount(self.proteins.bound_kind, minlength=KIND_COMPETITOR + 1)
+        slot = self._graph_samples % GRAPH_HISTORY
+        self._graph_history[:, slot] = self._graph_history[:, slot + GRAPH_HISTORY] = counts[[KIND_LIGAND, KIND_COMPETITOR]]
+        self._graph_samples += 1
+        self._plot_latest_sample()
+
+    def _graph_window(self, n):
+        # View of the last n samples (at most GRAPH_HISTORY), oldest first
+        n = min(n, self._graph_samples, GRAPH_HISTORY)
+        end = self._graph_samples % GRAPH_HISTORY + GRAPH_HISTORY
+        return self._graph_history[:, end - n:end]
+
+    def _graph_y(self, value):
+        # Pixel row in the plot for a count (or an array of counts)
+        plot_height = self._graph_plot_rect.height
+        return plot_height - 1 - np.rint(np.multiply(value, (plot_height - 1) / max(self._graph_ymax, 1))).astype(int)
+
+    def _redraw_graph(self):
+        surf = self.graph_surf
+        plot_rect = self._graph_plot_rect
+        self._graph_ymax = self.params.num_proteins
+        surf.fill(DARK_GREY)
+        surf.blit(self._graph_title, ((surf.get_width() - self._graph_title.get_width()) // 2, 4))
+        for value in (0, self._graph_ymax):
+            # Axis labels are rendered once per value; the protein slider revisits the same few
+            tick = self._graph_ticks.get(value)
+            if tick is None:
+                tick = self._graph_ticks[value] = self.small_font.render(str(value), True, WHITE)
+            surf.blit(tick, (plot_rect.left - tick.get_width() - 4, plot_rect.top + self._graph_y(value) - tick.get_height() // 2))
+        pygame.draw.line(surf, WHITE, (plot_rect.left - 1, plot_rect.top), (plot_rect.left - 1, plot_rect.bottom))
+        pygame.draw.line(surf, WHITE, (plot_rect.left - 1, plot_rect.bottom), (plot_rect.right, plot_rect.bottom))
+        # One pixel column per sample, newest sample at the right edge
+        plot_width = plot_rect.width
+        window = self._graph_window(plot_width)
+        if window.shape[1] > 1:
+            x = np.arange(plot_width - window.shape[1], plot_width)
+            for series_y, color in zip(self._graph_y(window), (NORMAL_LIGAND_COLOR, COMPETITOR_LIGAND_COLOR)):
+                pygame.draw.aalines(self._graph_plot_surf, color, False, np.column_stack((x, series_y)).tolist())
+
+    def _plot_latest_sample(self):
+        if self._graph_ymax != self.params.num_proteins or self._graph_samples < 2:
+            self._redraw_graph()
+            return
+        # Scroll the plot left by one pixel and draw only the newest segments
+        plot = self._graph_plot_surf
+        plot.scroll(-1, 0)
+        x = plot.get_width() - 1
+        plot.fill(DARK_GREY, (x, 0, 1, plot.get_height()))
+        for (previous, latest), color in zip(self._graph_window(2), (NORMAL_LIGAND_COLOR, COMPETITOR_LIGAND_COLOR)):
+            pygame.draw.aaline(plot, color, (x - 1, self._graph_y(previous)), (x, self._graph_y(latest)))
 
     def _initialize_particles(self):
-        self.proteins.clear()
-        self.ligands.clear()
-        self.competitor_ligands.clear()
-        for _ in range(int(self.params.num_proteins)):
-            protein = self._create_particle(Protein)
-            self.proteins.append(protein)
-        for _ in range(int(self.params.num_ligands)):
-            ligand = self._create_particle(Ligand)
-            self.ligands.append(ligand)
-            ligand.unbind()
-        for _ in range(int(self.params.num_competitor_ligands)):
-            competitor = self._create_particle(CompetitorLigand)
-            self.competitor_ligands.append(competitor)
-            competitor.unbind()
+        for batch in self.batches:
+            batch.truncate(0)
+        self._create_particles(self.proteins, int(self.params.num_proteins))
+        self._create_particles(self.ligands, int(self.params.num_ligands))
+        self._create_particles(self.competitor_ligands, int(self.params.num_competitor_ligands))
 
     def _update_particle_counts(self):
-        if len(self.proteins) < self.params.num_proteins:
-            for _ in range(self.params.num_proteins - len(self.proteins)):
-                self.proteins.append(self._create_particle(Protein))
-        elif len(self.proteins) > self.params.num_proteins:
-             for _ in range(len(self.proteins) - self.params.num_proteins):
-                 if self.proteins: self.proteins.pop().bound_ligands.clear()
-        if len(self.ligands) < self.params.num_ligands:
-             for _ in range(self.params.num_ligands - len(self.ligands)):
-                 l = self._create_particle(Ligand); self.ligands.append(l); l.unbind()
-        elif len(self.ligands) > self.params.num_ligands:
-             for _ in range(len(self.ligands) - self.params.num_ligands):
-                 if self.ligands: self.ligands.pop()
-        if len(self.competitor_ligands) < self.params.num_competitor_ligands:
-             for _ in range(self.params.num_competitor_ligands - len(self.competitor_ligands)):
-                 c = self._create_particle(CompetitorLigand); self.competitor_ligands.append(c); c.unbind()
-        elif len(self.competitor_ligands) > self.params.num_competitor_ligands:
-             for _ in range(len(self.competitor_ligands) - self.params.num_competitor_ligands):
-                 if self.competitor_ligands: self.competitor_ligands.pop()
-
-    def _create_particle(self, particle_class):
-        all_particles = self.proteins + self.ligands + self.competitor_ligands
-        for _ in range(100):
-            new_x = random.randint(particle_class.radius, self.sim_rect.width - particle_class.radius)
-            new_y = random.randint(particle_class.radius, self.sim_rect.height - particle_class.radius)
-            new_particle = particle_class(new_x, new_y)
-            overlap = False
-            for particle in all_particles:
-                dist = new_particle.position.distance_to(particle.position)
-                if dist < new_particle.radius + particle.radius:
-                    overlap = True; break
-            if not overlap: return new_particle
-        return particle_class(0,0)
+        num_proteins = int(self.params.num_proteins)
+        if len(self.proteins) < num_proteins:
+            self._create_particles(self.proteins, num_proteins - len(self.proteins))
+        elif len(self.proteins) > num_proteins:
+            # Release ligands docked to the proteins that are about to disappear
+            for batch in self.ligand_batches:
+                self._unbind(batch, self.proteins.bound_to[num_proteins:][self.proteins.bound_kind[num_proteins:] == batch.kind])
+            self.proteins.truncate(num_proteins)
+        for batch, count in ((self.ligands, self.params.num_ligands), (self.competitor_ligands, self.params.num_competitor_ligands)):
+            count = int(count)
+            if len(batch) < count:
+                self._create_particles(batch, count - len(batch))
+            elif len(batch) > count:
+                removed = batch.bound_to[count:]
+                self.proteins.clear_partner(removed[removed >= 0])
+                batch.truncate(count)
+
+    def _create_particles(self, batch, count):
+        if count > 0:
+            batch.append(self._spawn_positions(batch.radius, count))
+
+    def _spawn_positions(self, radius, count):
+        # Jittered grid placement: each new particle gets its own cell, so new
+        # particles never overlap each other and no rejection loop is needed.
+        cols = self.sim_rect.width // SPAWN_CELL_SIZE
+        rows = self.sim_rect.height // SPAWN_CELL_SIZE
+        taken = np.zeros(cols * rows, dtype=bool)
+        for batch in self.batches:
+            cx = np.clip(batch.pos[:, 0] // SPAWN_CELL_SIZE, 0, cols - 1).astype(np.int32)
+            cy = np.clip(batch.pos[:, 1] // SPAWN_CELL_SIZE, 0, rows - 1).astype(np.int32)
+            taken[cy * cols + cx] = True
+        cells = self.rng.permutation(np.flatnonzero(~taken))[:count]
+        if len(cells) < count:
+            # Scene is full: share cells rather than fail
+            cells = np.concatenate((cells, self.rng.integers(0, cols * rows, count - len(cells))))
+        centers = np.column_stack(((cells % cols + 0.5) * SPAWN_CELL_SIZE, (cells // cols + 0.5) * SPAWN_CELL_SIZE))
+        jitter = SPAWN_CELL_SIZE / 2 - radius
+        positions = (centers + self.rng.uniform(-jitter, jitter, (count, 2))).astype(np.float32)
+
+        # Particles already on screen drift across cell borders and may still overlap a new one;
+        # give those a free spot among a batch of random candidates (bound ligands sit on their protein)
+        others = [self.proteins.pos] + [batch.pos[~batch.is_bound] for batch in self.ligand_batches]
+        other_pos = np.concatenate(others)
+        other_radius = np.repeat(np.array([batch.radius for batch in self.batches], dtype=np.float32), [len(p) for p in others])
+        # Broadphase over the placed particles, built once per spawn: KD-tree if available, else the grid
+        other_tree = None
+        if SCIPY_AVAILABLE:
+            other_tree = cKDTree(other_pos)
+        else:
+            self._placement_grid.rebuild(other_pos)
+        lo = (self.sim_rect.left + radius, self.sim_rect.top + radius)
+        hi = (self.sim_rect.right - radius, self.sim_rect.bottom - radius)
+        for i in np.flatnonzero(self._overlaps_existing(positions, radius, other_pos, other_radius, other_tree)):
+            candidates = self.rng.uniform(lo, hi, (SPAWN_CANDIDATES, 2)).astype(np.float32)
+            d = candidates[:, None, :] - positions[None, :, :]
+            d2 = np.einsum('ijk,ijk->ij', d, d)
+            d2[:, i] = np.inf
+            free = ~self._overlaps_existing(candidates, radius, other_pos, other_radius, other_tree) & (d2.min(axis=1) >= (2 * radius) ** 2)
+            if free.any():
+                positions[i] = candidates[np.argmax(free)]
+            # Otherwise keep the overlapping spot; the particles drift apart
+        return positions
+
+    def _overlaps_existing(self, pos, radius, other_pos, other_radius, other_tree=None):
+        # Which of pos touch one of other_pos; without other_tree, _placement_grid must hold other_pos
+        if other_tree is not None:
+            pairs = other_tree.sparse_distance_matrix(cKDTree(pos), radius + max(PROTEIN_RADIUS, LIGAND_RADIUS), output_type='ndarray')
+            query, item = pairs['j'], pairs['i']
+        else:
+            query, item = self._placement_grid.query_pairs(pos)
+        d = pos[query] - other_pos[item]
+        hit = np.einsum('ij,ij->i', d, d) < (radius + other_radius[item]) ** 2
+        overlaps = np.zeros(len(pos), dtype=bool)
+        overlaps[query[hit]] = True
+        return overlaps
+
+    def _unbind(self, batch, idx):
+        # Release the bound ligands idx of batch in one pass
+        if len(idx) == 0: return
+        protein = batch.bound_to[idx]
+        self.proteins.clear_partner(protein)
+        protein_pos = self.proteins.pos[protein]
+        # Leave on the side the ligand docked from; random direction if it sits exactly on the centre
+        direction = batch.pos[idx] - protein_pos
+        length = np.sqrt(np.einsum('ij,ij->i', direction, direction))
+        centred = length == 0
+        if centred.any():
+            angle = self.rng.uniform(0, 2 * math.pi, int(centred.sum()))
+            direction[centred] = np.column_stack((np.cos(angle), np.sin(angle)))
+            length[centred] = 1
+        direction /= length[:, None]
+        batch.pos[idx] = protein_pos + direction * self._separation[batch.kind]
+        batch.vel[idx] = direction * self.rng.uniform(1, 2, (len(idx), 1)).astype(np.float32)
+        batch.clear_partner(idx)
+
+    def _rebuild_protein_grid(self):
+        # A 3x3 neighbourhood covers the capture radius as long as cells are at least that wide;
+        # larger cells only add candidates. Recreate the grid if the radius changed.
+        grid = self.protein_grid
+        if grid is None or grid.cell_size != self._capture_r:
+            grid = self.protein_grid = SpatialGrid(self.sim_rect.width, self.sim_rect.height, self._capture_r)
+        grid.rebuild(self.proteins.pos)
+        return grid
 
     def _update_simulation(self):
-        if not self.paused:
-            all_movers = self.proteins + self.ligands + self.competitor_ligands
-            for particle in all_movers:
-                if isinstance(particle, Protein) or not particle.is_bound:
-                    particle.move_brownian(self.params)
-                    particle.check_wall_collision_and_bounce(self.sim_rect)
-            for ligand in self.ligands + self.competitor_ligands:
-                if ligand.is_bound:
-                    if ligand.bound_to:
-                        ligand.position = pygame.Vector2(ligand.bound_to.position)
-                    
-                    p_off = 1 - math.exp(-self.params.k_off * self.params.dt)
-                    if random.random() < p_off: ligand.unbind()
-                else:
-                    for protein in self.proteins:
-                        if not protein.bound_ligands:
-                            dist = ligand.position.distance_to(protein.position)
-                            if dist < protein.radius + self.params.binding_radius:
-                                p_on = 1 - math.exp(-self.params.k_on_competitor * self.params.dt) if isinstance(ligand, CompetitorLigand) else 1 - math.exp(-self.params.k_on * self.params.dt)
-                                if random.random() < p_on:
-                                    ligand.is_bound = True; ligand.bound_to = protein
-                                    ligand.color = BOUND_LIGAND_COLOR; protein.bound_ligands.append(ligand)
-                                    break
+        # Free/bound split per species, taken once before anything moves. The NumPy path reuses it
+        # for motion, unbinding and binding, so a ligand released this step does not rebind.
+        partitions = [(None, None) if NUMBA_AVAILABLE else (np.flatnonzero(~batch.is_bound), np.flatnonzero(batch.is_bound)) for batch in self.ligand_batches]
+        move_brownian(self.proteins.pos, self.proteins.vel, self._brownian_scale, self.rng, *self._wall_limits[KIND_PROTEIN], scratch=self.proteins.scratch)
+        for batch, (free_idx, _) in zip(self.ligand_batches, partitions):
+            move_brownian(batch.pos, batch.vel, self._brownian_scale, self.rng, *self._wall_limits[batch.kind], batch.is_bound, free_idx, batch.scratch)
+
+        # Broadphase, built once per step: grid for the kernels, KD-tree (if available) or grid
+        # for the NumPy path, nothing when the NumPy path tests all pairs
+        grid = protein_tree = None
+        if NUMBA_AVAILABLE or (len(self.proteins) >= GRID_MIN_PROTEINS and not SCIPY_AVAILABLE):
+            grid = self._rebuild_protein_grid()
+        elif len(self.proteins) >= GRID_MIN_PROTEINS:
+            protein_tree = cKDTree(self.proteins.pos)
+        for batch, (free_idx, bound_idx) in zip(self.ligand_batches, partitions):
+            p_on = self._p_on[batch.kind]
+            if NUMBA_AVAILABLE:
+                target = batch.scratch_index[:len(batch)]
+                find_binding_targets(batch.pos, batch.is_bound, self.proteins.pos, self.proteins.is_bound,
+                                     grid.cell_start, grid.cell_items, grid.cols, grid.rows, grid.cell_size,
+                                     self._capture_r, self._capture_r2, target)
+                binding_step(batch.kind, batch.pos, batch.vel, batch.is_bound, batch.bound_to,
+                             self.proteins.pos, self.proteins.is_bound, self.proteins.bound_to, self.proteins.bound_kind,
+                             target, self._separation[batch.kind], p_on, self._p_off)
+                continue
+            self._unbind(batch, bound_idx[batch.uniforms(self.rng, len(bound_idx)) < self._p_off])
+            self._bind_free_ligands(batch, free_idx, p_on, protein_tree)
+
+    def _bind_free_ligands(self, batch, free_idx, p_on, protein_tree=None):
+        num_proteins = len(self.proteins)
+        if len(free_idx) == 0 or num_proteins == 0: return
+        lig_pos = batch.pos[free_idx]
+        if num_proteins < GRID_MIN_PROTEINS:
+            # Few proteins: every (ligand, protein) pair
+            query = np.repeat(np.arange(len(free_idx), dtype=np.int32), num_proteins)
+            protein = np.tile(np.arange(num_proteins, dtype=np.int32), len(free_idx))
+        elif protein_tree is not None:
+            # Tree-vs-tree search in C; returns only pairs within the capture radius
+            pairs = protein_tree.sparse_distance_matrix(cKDTree(lig_pos), self._capture_r, output_type='ndarray')
+            query, protein = pairs['j'], pairs['i']
+        else:
+            # Only (ligand, protein) pairs from neighbouring grid cells are tested
+            query, protein = self.protein_grid.query_pairs(lig_pos)
+        d = lig_pos[query] - self.proteins.pos[protein]
+        hit = (np.einsum('ij,ij->i', d, d) < self._capture_r2) & ~self.proteins.is_bound[protein]
+        # Each ligand targets its lowest-index candidate protein
+        target = batch.scratch_index[:len(free_idx)]
+        target.fill(num_proteins)
+        np.minimum.at(target, query[hit], protein[hit])
+        accept = (target < num_proteins) & (batch.uniforms(self.rng, len(free_idx)) < p_on)
+        # Several ligands may have picked the same protein; the lowest ligand index wins
+        protein, first = np.unique(target[accept], return_index=True)
+        ligand = free_idx[accept][first]
+        batch.is_bound[ligand] = True
+        batch.bound_to[ligand] = protein
+        self.proteins.is_bound[protein] = True
+        self.proteins.bound_to[protein] = ligand
+        self.proteins.bound_kind[protein] = batch.kind
+
+    def _draw_particles(self, target, scale):
+        target.fill(BLUE)
+        sprites = self._sprite_set(scale)
+        # One homogeneous run per sprite; top-left corners are never closer than one radius to the edge
+        runs = [(sprites['protein'], self.proteins.pos)]
+        for batch, key in ((self.ligands, 'ligand'), (self.competitor_ligands, 'competitor')):
+            runs.append((sprites[key], batch.pos[~batch.is_bound]))
+        # Bound ligands of both species look alike and are not moved by the simulation;
+        # draw one run on the occupied docking sites
+        runs.append((sprites['bound'], self.proteins.pos[self.proteins.is_bound]))
+        # Chained straight into blits; no combined list is built. Pixel corners fit in int16,
+        # a quarter of the bytes of the default int64 conversion.
+        target.blits(chain.from_iterable(zip(repeat(sprite), (pos * scale - sprite.get_width() // 2).astype(np.int16).tolist()) for sprite, pos in runs), doreturn=False)
 
     def _draw_ui(self):
-        pygame.draw.rect(self.screen, BLUE, self.sim_rect)
-        for protein in self.proteins:
-            pygame.draw.circle(self.screen, protein.color, (int(protein.position.x), int(protein.position.y)), int(protein.radius))
-            pygame.draw.circle(self.screen, DOCKING_SITE_COLOR, (int(protein.position.x), int(protein.position.y)), 5)
-        for ligand in self.ligands + self.competitor_ligands:
-            pygame.draw.circle(self.screen, ligand.color, (int(ligand.position.x), int(ligand.position.y)), int(ligand.radius))
+        sim_surface = self.screen.subsurface(self.sim_rect)
+        num_particles = sum(map(len, self.batches))
+        scale = self.params.render_scale
+        if num_particles > LOW_RES_PARTICLE_THRESHOLD and scale != 1.0:
+            # Rasterize crowded scenes at reduced resolution, then upscale; graph and GUI stay native
+            size = (int(self.sim_rect.width * scale), int(self.sim_rect.height * scale))
+            if self._low_res_surface is None or self._low_res_surface.get_size() != size:
+                self._low_res_surface = pygame.Surface(size)
+            self._draw_particles(self._low_res_surface, scale)
+            pygame.transform.scale(self._low_res_surface, self.sim_rect.size, sim_surface)
+        else:
+            self._draw_particles(sim_surface, 1.0)
         
         # UI nur zeichnen, wenn der Manager existiert
         if self.ui_manager:
             self.ui_manager.update(self.clock.get_time() / 1000.0)
             self.ui_manager.draw_ui(self.screen)
         
-        graph_surf = self._draw_graph()
-        self.screen.blit(graph_surf, (self.sidebar_rect.x + 20, 550))
+        graph_pos = (self.sidebar_rect.x + 20, 550)
+        self.screen.blit(self.graph_surf, graph_pos)
+        self.screen.blit(self._graph_legend, (graph_pos[0] + self._graph_legend_pos[0], graph_pos[1] + self._graph_legend_pos[1]))
+
+    def _apply_slider_changes(self):
+        # Sliders fire once per pixel of drag; apply each slider's latest value, and the
+        # resulting resize or rate update, at most once per frame. Moves that leave the
+        # shown value unchanged (sub-integer counts, third decimal of a rate) are dropped.
+        if not self._pending_sliders: return
+        counts_changed = rates_changed = False
+        for slider, value in self._pending_sliders.items():
+            if slider == self.num_proteins_slider and int(value) != self.params.num_proteins:
+                self.params.num_proteins = int(value); self.num_proteins_label.set_text(f'Num Proteins: {self.params.num_proteins}'); counts_changed = True
+            elif slider == self.num_ligands_slider and int(value) != self.params.num_ligands:
+                self.params.num_ligands = int(value); self.num_ligands_label.set_text(f'Num Ligands: {self.params.num_ligands}'); counts_changed = True
+            elif slider == self.num_competitor_ligands_slider and int(value) != self.params.num_competitor_ligands:
+                self.params.num_competitor_ligands = int(value); self.num_competitor_ligands_label.set_text(f'Num Competitors: {self.params.num_competitor_ligands}'); counts_changed = True
+            elif slider == self.temp_slider and round(value, 2) != round(self.params.temperature, 2):
+                self.params.temperature = value; self.temp_label.set_text(f'Temperature: {value:.2f}'); rates_changed = True
+            elif slider == self.kon_slider and round(value, 2) != round(self.params.k_on, 2):
+                self.params.k_on = value; self.kon_label.set_text(f'Ligand Binding Prob. (k_on): {value:.2f}'); rates_changed = True
+            elif slider == self.kon_competitor_slider and round(value, 2) != round(self.params.k_on_competitor, 2):
+                self.params.k_on_competitor = value; self.kon_competitor_label.set_text(f'Competitor Binding Prob. (k_on): {value:.2f}'); rates_changed = True
+        self._pending_sliders.clear()
+        if counts_changed: self._update_particle_counts()
+        if rates_changed: self._update_rate_constants()
 
     async def run(self):
         running = True
@@ -366,21 +802,17 @@ class Simulation:
                         elif event.ui_element == self.pause_button: self.paused = True
                         elif event.ui_element == self.resume_button: self.paused = False
                     if event.type == pygame_gui.UI_HORIZONTAL_SLIDER_MOVED:
-                        if event.ui_element == self.num_proteins_slider:
-                            self.params.num_proteins = int(event.value); self.num_proteins_label.set_text(f'Num Proteins: {self.params.num_proteins}'); self._update_particle_counts()
-                        elif event.ui_element == self.num_ligands_slider:
-                            self.params.num_ligands = int(event.value); self.num_ligands_label.set_text(f'Num Ligands: {self.params.num_ligands}'); self._update_particle_counts()
-                        elif event.ui_element == self.num_competitor_ligands_slider:
-                            self.params.num_competitor_ligands = int(event.value); self.num_competitor_ligands_label.set_text(f'Num Competitors: {self.params.num_competitor_ligands}'); self._update_particle_counts()
-                        elif event.ui_element == self.temp_slider:
-                            self.params.temperature = event.value; self.temp_label.set_text(f'Temperature: {event.value:.2f}')
-                        elif event.ui_element == self.kon_slider:
-                            self.params.k_on = event.value; self.kon_label.set_text(f'Ligand Binding Prob. (k_on): {event.value:.2f}')
-                        elif event.ui_element == self.kon_competitor_slider:
-                            self.params.k_on_competitor = event.value; self.kon_competitor_label.set_text(f'Competitor Binding Prob. (k_on): {event.value:.2f}')
-
-            self._update_simulation()
-            self._update_graph_data()
+                        # Only the latest value per slider is kept; see _apply_slider_changes
+                        self._pending_sliders[event.ui_element] = event.value
+
+            self._apply_slider_changes()
+
+            # A paused simulation is frozen: no stepping and no duplicate graph samples
+            if not self.paused:
+                self._update_simulation()
+                self._graph_tick_counter += 1
+                if self._graph_tick_counter % GRAPH_SAMPLE_INTERVAL == 0:
+                    self._update_graph_data()
             self.screen.fill(BLACK)
             self._draw_ui()
             pygame.display.flip()